@@ -11,46 +11,270 @@ Date: 2025
 
 import os
 import sys
+import errno
+import shutil
+import socket
 import subprocess
 import logging
+import logging.handlers
+import atexit
 import time
 import signal
+import select
+import threading
 import psutil
+from collections import deque
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Protocol
 import json
 import argparse
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that reuses the formatted timestamp within the same second"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (epoch second, formatted time) - swapped as one tuple so handlers
+        # formatting on different threads never see a mismatched pair
+        self._cached_time = (None, "")
+    
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        
+        second = int(record.created)
+        cached_second, cached_text = self._cached_time
+        if second != cached_second:
+            cached_text = time.strftime(self.default_time_format, self.converter(record.created))
+            self._cached_time = (second, cached_text)
+        return self.default_msec_format % (cached_text, record.msecs)
+
 # Configure logging
+log_formatter = CachedTimeFormatter('%(asctime)s - %(levelname)s - %(message)s')
+
+file_handler = logging.FileHandler('deployment.log')
+file_handler.setFormatter(log_formatter)
+
+console_handler = logging.StreamHandler(sys.stdout)
+console_handler.setFormatter(log_formatter)
+
+# Buffer file writes so chatty INFO records are written in batches;
+# anything at WARNING or above flushes the buffer immediately.
+log_file_handler = logging.handlers.MemoryHandler(
+    capacity=512,
+    flushLevel=logging.WARNING,
+    target=file_handler
+)
+atexit.register(log_file_handler.flush)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('deployment.log'),
-        logging.StreamHandler(sys.stdout)
+        log_file_handler,
+        console_handler
     ]
 )
 
 logger = logging.getLogger(__name__)
 
+# Health probes target the loopback address directly to skip name resolution
+LOCALHOST = '127.0.0.1'
+
+# Tools the deployment needs on PATH
+REQUIRED_TOOLS = ('git', 'java', 'ssh')
+
+# Seconds between "still running" heartbeats (only emitted at DEBUG level)
+HEARTBEAT_INTERVAL = 300
+
+# Seconds to wait for a freshly started application to accept connections
+STARTUP_TIMEOUT = 30
+
+# Build output directories checked for a JAR before walking the whole repository
+JAR_BUILD_DIRS = (Path("build") / "libs", Path("target"))
+
+# Build by-products that sit next to the executable JAR but cannot be run
+NON_EXECUTABLE_JAR_SUFFIXES = ('-plain.jar', '-sources.jar', '-javadoc.jar')
+
+# Directories never worth descending into when searching for a JAR
+JAR_SEARCH_SKIP_DIRS = frozenset({'.git', 'node_modules', '.gradle'})
+
 class DeploymentError(Exception):
     """Custom exception for deployment errors"""
     pass
 
+def _stream_to_log(stream, level: int, tail: Optional[deque] = None) -> threading.Thread:
+    """Forward a child process stream to the logger line by line"""
+    def pump():
+        with stream:
+            for line in stream:
+                line = line.rstrip()
+                logger.log(level, line)
+                if tail is not None:
+                    tail.append(line)
+    
+    reader = threading.Thread(target=pump, daemon=True)
+    reader.start()
+    return reader
+
+def _spawn_options(program: str) -> Dict[str, Any]:
+    """Subprocess options that let CPython use posix_spawn() (only without cwd=)"""
+    return {
+        'executable': shutil.which(program),
+        'close_fds': False,
+        'stdin': subprocess.DEVNULL
+    }
+
+def _discard_tree(path: Path) -> Optional[threading.Thread]:
+    """Move a directory out of the way and delete it in the background"""
+    # Copies left behind by an interrupted earlier run are removed as well
+    doomed = sorted(path.parent.glob(f".{path.name}.old-*"))
+    trash = path.with_name(f".{path.name}.old-{os.getpid()}-{time.monotonic_ns()}")
+    try:
+        os.rename(path, trash)
+        doomed.append(trash)
+    except OSError:
+        shutil.rmtree(path, ignore_errors=True)
+    
+    if not doomed:
+        return None
+    
+    def remove_all():
+        for tree in doomed:
+            shutil.rmtree(tree, ignore_errors=True)
+    
+    remover = threading.Thread(target=remove_all)
+    remover.start()
+    return remover
+
+def _is_runnable_jar(name: str) -> bool:
+    """Check whether a file name looks like an executable JAR"""
+    return name.endswith('.jar') and not name.endswith(NON_EXECUTABLE_JAR_SUFFIXES)
+
+def _find_first_jar(root) -> Optional[Path]:
+    """Return the shallowest *.jar under root, or None"""
+    # Breadth-first with sorted entries so the result does not depend on
+    # the order the filesystem lists directories in
+    pending = deque([root])
+    while pending:
+        try:
+            with os.scandir(pending.popleft()) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in JAR_SEARCH_SKIP_DIRS:
+                    pending.append(entry.path)
+            elif _is_runnable_jar(entry.name):
+                return Path(entry.path)
+    return None
+
+def _wait_for_exit(process: subprocess.Popen, timeout: float) -> bool:
+    """Wait until the process exits or the timeout elapses; True if it exited"""
+    if hasattr(os, 'pidfd_open'):
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except OSError:
+            pidfd = None
+        
+        if pidfd is not None:
+            try:
+                poller = select.poll()
+                poller.register(pidfd, select.POLLIN)
+                poller.poll(timeout * 1000)
+            finally:
+                os.close(pidfd)
+            return process.poll() is not None
+    
+    try:
+        process.wait(timeout=timeout)
+        return True
+    except subprocess.TimeoutExpired:
+        return False
+
+class Backend(Protocol):
+    """Process, socket and process-table operations used by a deployment"""
+    
+    def run(self, cmd: List[str], **kwargs) -> subprocess.CompletedProcess: ...
+    
+    def popen(self, cmd: List[str], **kwargs) -> subprocess.Popen: ...
+    
+    def tcp_connect(self, host: str, port: int, timeout: float) -> None: ...
+    
+    def port_in_use(self, port: int) -> bool: ...
+    
+    def list_connections(self, kind: str) -> list: ...
+    
+    def process(self, pid: int) -> psutil.Process: ...
+
+class SubprocessBackend:
+    """
+    Backend that talks to the real system via subprocess, socket and psutil
+    """
+    
+    def run(self, cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+        return subprocess.run(cmd, **kwargs)
+    
+    def popen(self, cmd: List[str], **kwargs) -> subprocess.Popen:
+        return subprocess.Popen(cmd, **kwargs)
+    
+    def tcp_connect(self, host: str, port: int, timeout: float) -> None:
+        """Open and close a TCP connection; raises OSError if nothing listens"""
+        with socket.create_connection((host, port), timeout=timeout):
+            pass
+    
+    def port_in_use(self, port: int) -> bool:
+        """Check with a single bind() whether anything holds the port"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(('0.0.0.0', port))
+            return False
+        except OSError as e:
+            if e.errno != errno.EADDRINUSE:
+                raise
+            return True
+        finally:
+            sock.close()
+    
+    def list_connections(self, kind: str) -> list:
+        return psutil.net_connections(kind=kind)
+    
+    def process(self, pid: int) -> psutil.Process:
+        return psutil.Process(pid)
+
 class JavaAppDeployment:
     """
     Handles deployment of Java application from GitHub repository
     """
     
-    def __init__(self, repo_url: str, repo_name: str, branch: str = "main"):
+    def __init__(self, repo_url: str, repo_name: str, branch: str = "main",
+                 backend: Optional[Backend] = None):
         self.repo_url = repo_url
         self.repo_name = repo_name
         self.branch = branch
+        self.backend = backend if backend is not None else SubprocessBackend()
         self.repo_path = Path.cwd() / repo_name
         self.jar_path = self.repo_path / "build" / "libs" / "project.jar"
         self.java_process: Optional[subprocess.Popen] = None
+        self._remover: Optional[threading.Thread] = None
+        self.java_log_path = Path.cwd() / "java-app.log"
+        self._java_log_offset = 0
         self.port = 9000
         
+        # Reuse one keep-alive connection across health probes
+        self._session = None
+        if requests is not None:
+            self._session = requests.Session()
+            self._session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -59,6 +283,7 @@ class JavaAppDeployment:
         """Handle shutdown signals gracefully"""
         logger.info(f"Received signal {signum}, shutting down gracefully...")
         self.cleanup()
+        log_file_handler.flush()
         sys.exit(0)
     
     def check_prerequisites(self) -> bool:
@@ -67,27 +292,13 @@ class JavaAppDeployment:
         """
         logger.info("Checking prerequisites...")
         
-        required_tools = {
-            'git': 'git --version',
-            'java': 'java -version',
-            'ssh': 'ssh -V'
-        }
-        
-        for tool, command in required_tools.items():
-            try:
-                result = subprocess.run(
-                    command.split(), 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=10
-                )
-                if result.returncode != 0 and tool != 'ssh':  # ssh -V returns 1 but still works
-                    logger.error(f"{tool} is not available or not working properly")
-                    return False
-                logger.info(f"✓ {tool} is available")
-            except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-                logger.error(f"✗ {tool} check failed: {e}")
+        # Locating each binary on PATH is enough and needs no child processes
+        for tool in REQUIRED_TOOLS:
+            tool_path = shutil.which(tool)
+            if tool_path is None:
+                logger.error(f"✗ {tool} is not available on PATH")
                 return False
+            logger.info(f"✓ {tool} is available at {tool_path}")
         
         return True
     
@@ -109,18 +320,20 @@ class JavaAppDeployment:
         
         # Test SSH connection to GitHub
         try:
-            result = subprocess.run(
+            result = self.backend.run(
                 ["ssh", "-T", "-o", "StrictHostKeyChecking=no", "git@github.com"],
                 capture_output=True,
-                text=True,
-                timeout=30
+                timeout=30,
+                **_spawn_options("ssh")
             )
-            if "successfully authenticated" in result.stderr:
+            # Search the raw bytes; only decode when we need to log them
+            if b"successfully authenticated" in result.stderr:
                 logger.info("✓ SSH connection to GitHub successful")
                 return True
             else:
                 logger.error("✗ SSH connection to GitHub failed")
-                logger.error(f"SSH output: {result.stderr}")
+                ssh_output = result.stderr.decode('utf-8', errors='replace')
+                logger.error(f"SSH output: {ssh_output}")
                 return False
         except subprocess.TimeoutExpired:
             logger.error("✗ SSH connection to GitHub timed out")
@@ -136,29 +349,44 @@ class JavaAppDeployment:
         logger.info(f"Cloning repository: {self.repo_url}")
         
         try:
-            # Remove existing repository if it exists
+            # Remove existing repository and any leftovers from interrupted runs
             if self.repo_path.exists():
                 logger.info("Removing existing repository...")
-                subprocess.run(["rm", "-rf", str(self.repo_path)], check=True)
+            self._remover = _discard_tree(self.repo_path)
             
             # Clone repository
             clone_cmd = [
                 "git", "clone", 
+                "--depth=1",  # Shallow clone for faster download
+                "--single-branch",
                 "--branch", self.branch,
-                "--depth", "1",  # Shallow clone for faster download
                 self.repo_url, 
                 str(self.repo_path)
             ]
             
-            result = subprocess.run(
+            process = self.backend.popen(
                 clone_cmd,
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=300  # 5 minutes timeout
+                bufsize=1,
+                **_spawn_options("git")
             )
+            stderr_tail: deque = deque(maxlen=20)
+            reader = _stream_to_log(process.stderr, logging.DEBUG, stderr_tail)
             
-            if result.returncode != 0:
-                logger.error(f"Git clone failed: {result.stderr}")
+            try:
+                returncode = process.wait(timeout=300)  # 5 minutes timeout
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                raise
+            finally:
+                reader.join()
+            
+            if returncode != 0:
+                stderr_output = "\n".join(stderr_tail)
+                logger.error(f"Git clone failed: {stderr_output}")
                 return False
             
             logger.info("✓ Repository cloned successfully")
@@ -180,14 +408,10 @@ class JavaAppDeployment:
         if not self.jar_path.exists():
             logger.error(f"✗ JAR file not found at: {self.jar_path}")
             
-            # Try to find JAR files in the repository
-            jar_files = list(self.repo_path.rglob("*.jar"))
-            if jar_files:
-                logger.info("Found JAR files in repository:")
-                for jar in jar_files:
-                    logger.info(f"  - {jar}")
-                # Use the first JAR file found
-                self.jar_path = jar_files[0]
+            # Try to find a JAR file elsewhere in the repository
+            jar_file = self._locate_jar()
+            if jar_file:
+                self.jar_path = jar_file
                 logger.info(f"Using JAR file: {self.jar_path}")
             else:
                 logger.error("No JAR files found in the repository")
@@ -195,11 +419,12 @@ class JavaAppDeployment:
         
         # Check if JAR file is valid
         try:
-            result = subprocess.run(
+            result = self.backend.run(
                 ["java", "-jar", str(self.jar_path), "--help"],
                 capture_output=True,
                 text=True,
-                timeout=30
+                timeout=30,
+                **_spawn_options("java")
             )
             # Some applications might not support --help, so we don't fail on non-zero exit
             logger.info("✓ JAR file appears to be valid")
@@ -211,6 +436,20 @@ class JavaAppDeployment:
             logger.warning(f"JAR file validation failed: {e}, proceeding anyway...")
             return True
     
+    def _locate_jar(self) -> Optional[Path]:
+        """
+        Find a JAR when the expected path is missing, build output dirs first
+        """
+        for build_dir in JAR_BUILD_DIRS:
+            jar_files = sorted(
+                jar for jar in (self.repo_path / build_dir).glob("*.jar")
+                if _is_runnable_jar(jar.name)
+            )
+            if jar_files:
+                return jar_files[0]
+        
+        return _find_first_jar(self.repo_path)
+    
     def check_port_availability(self) -> bool:
         """
         Check if the required port is available
@@ -218,17 +457,28 @@ class JavaAppDeployment:
         logger.info(f"Checking if port {self.port} is available...")
         
         try:
-            # Check if port is already in use
-            for conn in psutil.net_connections():
-                if conn.laddr.port == self.port:
-                    logger.warning(f"Port {self.port} is already in use by PID: {conn.pid}")
+            # Only walk the connection table when the port is actually taken
+            if self.backend.port_in_use(self.port):
+                # Accepted connections share the listener's PID, so only
+                # the listening sockets identify the processes to stop
+                owner_pids = sorted({
+                    conn.pid for conn in self.backend.list_connections(kind='tcp')
+                    if conn.status == psutil.CONN_LISTEN
+                    and conn.laddr and conn.laddr.port == self.port and conn.pid
+                })
+                if not owner_pids:
+                    logger.error(f"✗ Port {self.port} is in use by a process that cannot be identified")
+                    return False
+                
+                for pid in owner_pids:
+                    logger.warning(f"Port {self.port} is already in use by PID: {pid}")
                     
                     # Try to kill the process using the port
                     try:
-                        process = psutil.Process(conn.pid)
+                        process = self.backend.process(pid)
                         process.terminate()
                         process.wait(timeout=10)
-                        logger.info(f"Terminated process {conn.pid} using port {self.port}")
+                        logger.info(f"Terminated process {pid} using port {self.port}")
                     except (psutil.NoSuchProcess, psutil.TimeoutExpired):
                         logger.error(f"Failed to terminate process using port {self.port}")
                         return False
@@ -247,9 +497,6 @@ class JavaAppDeployment:
         logger.info("Starting Java application...")
         
         try:
-            # Change to repository directory
-            os.chdir(self.repo_path)
-            
             # Start Java application
             cmd = ["java", "-jar", str(self.jar_path)]
             
@@ -257,67 +504,97 @@ class JavaAppDeployment:
             env = os.environ.copy()
             env["SERVER_PORT"] = str(self.port)
             
-            self.java_process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                env=env
-            )
+            # The app writes straight to an append-only log file, so there
+            # is no pipe for us to keep draining
+            with open(self.java_log_path, 'ab') as java_log:
+                self._java_log_offset = java_log.tell()
+                self.java_process = self.backend.popen(
+                    cmd,
+                    stdout=java_log,
+                    stderr=subprocess.STDOUT,
+                    env=env,
+                    cwd=str(self.repo_path)
+                )
             
             logger.info(f"✓ Java application started with PID: {self.java_process.pid}")
+            logger.info(f"Java application output is written to: {self.java_log_path}")
             
-            # Wait a bit and check if process is still running
-            time.sleep(5)
+            # Return as soon as the app accepts connections or exits,
+            # backing off between probes instead of sleeping a fixed time
+            deadline = time.monotonic() + STARTUP_TIMEOUT
+            delay = 0.1
+            while True:
+                if self.java_process.poll() is not None:
+                    logger.error(f"✗ Java application failed to start")
+                    self._log_java_output()
+                    return False
+                
+                if self._port_open():
+                    logger.info("✓ Java application is running successfully")
+                    return True
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, 2.0)
             
-            if self.java_process.poll() is None:
-                logger.info("✓ Java application is running successfully")
-                return True
-            else:
-                stdout, stderr = self.java_process.communicate()
-                logger.error(f"✗ Java application failed to start")
-                logger.error(f"STDOUT: {stdout}")
-                logger.error(f"STDERR: {stderr}")
-                return False
+            logger.warning(f"Java application is running but not accepting connections on port {self.port} yet")
+            return True
                 
         except Exception as e:
             logger.error(f"✗ Failed to start Java application: {e}")
             return False
     
+    def _port_open(self) -> bool:
+        """
+        Check whether the application accepts TCP connections on its port
+        """
+        try:
+            self.backend.tcp_connect(LOCALHOST, self.port, timeout=1)
+            return True
+        except OSError:
+            return False
+    
+    def _log_java_output(self) -> None:
+        """
+        Log the tail of the Java application's output after it has exited
+        """
+        try:
+            with open(self.java_log_path, 'rb') as java_log:
+                java_log.seek(self._java_log_offset)
+                tail = deque(java_log, maxlen=100)
+            output = b"".join(tail).decode('utf-8', errors='replace')
+        except OSError as e:
+            output = f"<unavailable: {e}>"
+        logger.error(f"OUTPUT: {output}")
+    
     def health_check(self) -> bool:
         """
         Perform health check on the running application
         """
         logger.info("Performing health check...")
         
-        try:
-            import requests
-            
-            # Try to connect to the application
-            response = requests.get(f"http://localhost:{self.port}/health", timeout=10)
-            if response.status_code == 200:
-                logger.info("✓ Health check passed")
-                return True
-        except ImportError:
+        if self._session is not None:
+            try:
+                # Try to connect to the application
+                response = self._session.get(f"http://localhost:{self.port}/health", timeout=10)
+                if response.ok:
+                    logger.info("✓ Health check passed")
+                    return True
+            except Exception as e:
+                logger.warning(f"Health check failed: {e}")
+        else:
             logger.warning("requests library not available, skipping HTTP health check")
-        except Exception as e:
-            logger.warning(f"Health check failed: {e}")
         
         # Alternative health check - just check if port is listening
         try:
-            import socket
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            result = sock.connect_ex(('localhost', self.port))
-            sock.close()
-            
-            if result == 0:
-                logger.info("✓ Application is listening on the port")
-                return True
-            else:
-                logger.error("✗ Application is not listening on the port")
-                return False
-                
+            self.backend.tcp_connect(LOCALHOST, self.port, timeout=5)
+            logger.info("✓ Application is listening on the port")
+            return True
+        except OSError:
+            logger.error("✗ Application is not listening on the port")
+            return False
         except Exception as e:
             logger.error(f"✗ Health check failed: {e}")
             return False
@@ -328,18 +605,24 @@ class JavaAppDeployment:
         """
         logger.info(f"Monitoring application for {duration} seconds...")
         
-        start_time = time.time()
+        if not self.java_process:
+            logger.warning("No Java application is running, nothing to monitor")
+            return
         
-        while time.time() - start_time < duration:
-            if self.java_process and self.java_process.poll() is not None:
+        # Wait in bounded slices; one poll() cannot take a timeout of ~25 days
+        deadline = time.monotonic() + duration
+        
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            
+            if _wait_for_exit(self.java_process, min(remaining, HEARTBEAT_INTERVAL)):
                 logger.error("✗ Java application has stopped unexpectedly")
-                stdout, stderr = self.java_process.communicate()
-                logger.error(f"STDOUT: {stdout}")
-                logger.error(f"STDERR: {stderr}")
+                self._log_java_output()
                 break
             
-            time.sleep(30)  # Check every 30 seconds
-            logger.info("Application is still running...")
+            logger.debug("Application is still running...")
         
         logger.info("Monitoring completed")
     
@@ -360,6 +643,14 @@ class JavaAppDeployment:
                 self.java_process.wait()
             except Exception as e:
                 logger.error(f"Error during cleanup: {e}")
+        
+        if self._session is not None:
+            self._session.close()
+        
+        # Let the old checkout finish deleting before the process exits
+        if self._remover is not None:
+            self._remover.join()
+            self._remover = None
     
     def deploy(self) -> bool:
         """
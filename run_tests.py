@@ -6,105 +6,107 @@ Test runner for the deployment automation project
 import sys
 import subprocess
 import os
+import logging
+import logging.handlers
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def run_command(command, description):
+SEPARATOR = "=" * 60
+
+# Buffer console output and emit it once per command (or immediately on errors)
+console_handler = logging.StreamHandler(sys.stdout)
+console_handler.setFormatter(logging.Formatter('%(message)s'))
+log_buffer = logging.handlers.MemoryHandler(
+    1024,
+    flushLevel=logging.ERROR,
+    target=console_handler
+)
+
+log = logging.getLogger("runner")
+log.setLevel(logging.INFO)
+log.propagate = False
+log.addHandler(log_buffer)
+output_lock = threading.Lock()
+
+def run_command(command, description, cwd=None):
     """Run a command and return the result"""
-    print(f"\n{'='*60}")
-    print(f"Running: {description}")
-    print(f"Command: {command}")
-    print(f"{'='*60}")
-    
+    result = None
+    error = None
     try:
         result = subprocess.run(
             command,
             shell=True,
+            cwd=cwd,
             capture_output=True,
             text=True,
             timeout=300
         )
-        
-        if result.stdout:
-            print("STDOUT:", result.stdout)
-        if result.stderr:
-            print("STDERR:", result.stderr)
-        
-        return result.returncode == 0
     except subprocess.TimeoutExpired:
-        print("❌ Command timed out")
-        return False
+        error = "timed out"
     except Exception as e:
-        print(f"❌ Command failed: {e}")
-        return False
+        error = f"failed: {e}"
+    
+    # Commands run concurrently, so emit each report as one contiguous block
+    with output_lock:
+        log.info("\n%s", SEPARATOR)
+        log.info("Running: %s", description)
+        log.info("Command: %s", command)
+        log.info("%s", SEPARATOR)
+        
+        if error:
+            log.error("❌ Command %s", error)
+        else:
+            if result.stdout:
+                log.info("STDOUT: %s", result.stdout)
+            if result.stderr:
+                log.info("STDERR: %s", result.stderr)
+        log_buffer.flush()
+    
+    return error is None and result.returncode == 0
 
 def main():
     """Main test runner"""
-    print("🚀 Starting Java Application Deployment Tests")
-    print("=" * 60)
+    log.info("🚀 Starting Java Application Deployment Tests")
+    log.info("%s", SEPARATOR)
     
     # Change to project directory
     project_dir = Path(__file__).parent
     os.chdir(project_dir)
     
-    # Test results
-    test_results = []
-    
-    # 1. Python script validation
-    test_results.append(run_command(
-        "python3 -m py_compile deploy.py",
-        "Python script syntax validation"
-    ))
-    
-    # 2. Python unit tests
-    test_results.append(run_command(
-        "python3 -m pytest tests/test_deploy.py -v",
-        "Python unit tests"
-    ))
-    
-    # 3. Dockerfile validation
-    test_results.append(run_command(
-        "docker run --rm -i hadolint/hadolint < Dockerfile",
-        "Dockerfile linting"
-    ))
-    
-    # 4. Terraform validation
-    os.chdir("infrastructure")
-    test_results.append(run_command(
-        "terraform fmt -check",
-        "Terraform formatting check"
-    ))
-    
-    test_results.append(run_command(
-        "terraform validate",
-        "Terraform configuration validation"
-    ))
-    
-    # 5. GitHub Actions workflow validation
-    os.chdir("..")
-    test_results.append(run_command(
-        "yamllint .github/workflows/deploy.yml",
-        "GitHub Actions workflow validation"
-    ))
+    # The steps share no state, so run them all at once
+    tasks = [
+        # 1. Python script validation
+        ("python3 -m py_compile deploy.py", "Python script syntax validation"),
+        # 2. Python unit tests
+        ("python3 -m pytest tests/test_deploy.py -v", "Python unit tests"),
+        # 3. Dockerfile validation
+        ("docker run --rm -i hadolint/hadolint < Dockerfile", "Dockerfile linting"),
+        # 4. Terraform validation
+        ("terraform fmt -check", "Terraform formatting check", "infrastructure"),
+        ("terraform validate", "Terraform configuration validation", "infrastructure"),
+        # 5. GitHub Actions workflow validation
+        ("yamllint .github/workflows/deploy.yml", "GitHub Actions workflow validation"),
+        # 6. Docker build test
+        ("docker build -t java-app-deployment-test .", "Docker image build test"),
+    ]
     
-    # 6. Docker build test
-    test_results.append(run_command(
-        "docker build -t java-app-deployment-test .",
-        "Docker image build test"
-    ))
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        test_results = list(executor.map(lambda task: run_command(*task), tasks))
     
     # Summary
-    print(f"\n{'='*60}")
-    print("TEST SUMMARY")
-    print(f"{'='*60}")
+    log.info("\n%s", SEPARATOR)
+    log.info("TEST SUMMARY")
+    log.info("%s", SEPARATOR)
     
     passed = sum(test_results)
     total = len(test_results)
     
     if passed == total:
-        print(f"✅ All tests passed! ({passed}/{total})")
+        log.info("✅ All tests passed! (%d/%d)", passed, total)
         return 0
     else:
-        print(f"❌ Some tests failed ({passed}/{total})")
+        log.error("❌ Some tests failed (%d/%d)", passed, total)
         return 1
 
 if __name__ == "__main__":
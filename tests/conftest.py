@@ -0,0 +1,49 @@
+"""
+Shared fixtures for the deployment script tests
+"""
+
+import copy
+import io
+import subprocess
+from unittest.mock import MagicMock
+
+import psutil
+import pytest
+
+from deploy import JavaAppDeployment
+
+class MockBackend:
+    """In-memory SubprocessBackend whose defaults describe a healthy system"""
+    
+    def __init__(self):
+        self.run = MagicMock(return_value=MagicMock(
+            spec=subprocess.CompletedProcess, returncode=0, stdout="", stderr=""
+        ))
+        
+        self.popen = MagicMock(return_value=MagicMock(
+            spec=subprocess.Popen, pid=1234, stderr=io.StringIO()
+        ))
+        self.popen.return_value.wait.return_value = 0
+        self.popen.return_value.poll.return_value = None
+        
+        self.tcp_connect = MagicMock(return_value=None)
+        self.port_in_use = MagicMock(return_value=False)
+        self.list_connections = MagicMock(return_value=[])
+        self.process = MagicMock(return_value=MagicMock(spec=psutil.Process))
+
+@pytest.fixture(scope="module")
+def base_deployment():
+    """A deployment of the test repository, built once per test module"""
+    return JavaAppDeployment(
+        repo_url="git@github.com:test/repo.git",
+        repo_name="test-repo",
+        branch="main",
+        backend=MockBackend()
+    )
+
+@pytest.fixture
+def deployment(base_deployment):
+    """A per-test copy of the base deployment with a fresh MockBackend"""
+    deployment = copy.copy(base_deployment)
+    deployment.backend = MockBackend()
+    return deployment
@@ -3,256 +3,473 @@
 Unit tests for the deployment script
 """
 
-import unittest
-import tempfile
 import os
+import errno
+import io
+import logging
+import re
+import socket
 import subprocess
-from unittest.mock import patch, MagicMock, mock_open
+from collections import namedtuple
+from unittest.mock import patch, MagicMock
 from pathlib import Path
 import sys
 
-# Add the parent directory to the path so we can import deploy
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from deploy import JavaAppDeployment, DeploymentError
-
-class TestJavaAppDeployment(unittest.TestCase):
-    """Test cases for JavaAppDeployment class"""
-    
-    def setUp(self):
-        """Set up test fixtures"""
-        self.deployment = JavaAppDeployment(
-            repo_url="git@github.com:test/repo.git",
-            repo_name="test-repo",
-            branch="main"
-        )
-    
-    def tearDown(self):
-        """Clean up test fixtures"""
-        if hasattr(self, 'temp_dir'):
-            import shutil
-            shutil.rmtree(self.temp_dir, ignore_errors=True)
-    
-    def test_initialization(self):
-        """Test proper initialization of JavaAppDeployment"""
-        self.assertEqual(self.deployment.repo_url, "git@github.com:test/repo.git")
-        self.assertEqual(self.deployment.repo_name, "test-repo")
-        self.assertEqual(self.deployment.branch, "main")
-        self.assertEqual(self.deployment.port, 9000)
-    
-    @patch('subprocess.run')
-    def test_check_prerequisites_success(self, mock_run):
-        """Test successful prerequisites check"""
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        result = self.deployment.check_prerequisites()
-        
-        self.assertTrue(result)
-        self.assertEqual(mock_run.call_count, 3)  # git, java, ssh
+import psutil
+import pytest
+
+from deploy import (
+    DeploymentError, CachedTimeFormatter, SubprocessBackend, HEARTBEAT_INTERVAL, log_file_handler,
+    _discard_tree, _find_first_jar
+)
+
+# Read-only results shared by tests that stub subprocess.run
+MOCK_SSH_AUTH = MagicMock(spec=subprocess.CompletedProcess, returncode=1, stderr=b"Hi test! You've successfully authenticated")
+MOCK_SSH_DENIED = MagicMock(spec=subprocess.CompletedProcess, returncode=255, stderr=b"Permission denied (publickey).")
+
+# Lightweight stand-ins for the entries psutil.net_connections() returns
+Addr = namedtuple("Addr", ["ip", "port"])
+Conn = namedtuple("Conn", ["laddr", "pid", "status", "family"])
+
+def test_initialization(deployment):
+    """Test proper initialization of JavaAppDeployment"""
+    assert deployment.repo_url == "git@github.com:test/repo.git"
+    assert deployment.repo_name == "test-repo"
+    assert deployment.branch == "main"
+    assert deployment.port == 9000
+
+@patch('shutil.which', side_effect=lambda tool: f"/usr/bin/{tool}")
+def test_check_prerequisites_success(mock_which, deployment):
+    """Test successful prerequisites check"""
+    result = deployment.check_prerequisites()
     
-    @patch('subprocess.run')
-    def test_check_prerequisites_failure(self, mock_run):
-        """Test failed prerequisites check"""
-        mock_run.side_effect = FileNotFoundError("Command not found")
-        
-        result = self.deployment.check_prerequisites()
-        
-        self.assertFalse(result)
-    
-    @patch('subprocess.run')
-    @patch('pathlib.Path.exists')
-    def test_setup_ssh_config_success(self, mock_exists, mock_run):
-        """Test successful SSH configuration"""
-        mock_exists.return_value = True
-        mock_run.return_value = MagicMock(returncode=0, stderr="successfully authenticated")
-        
-        result = self.deployment.setup_ssh_config()
-        
-        self.assertTrue(result)
+    assert result
+    assert mock_which.call_count == 3  # git, java, ssh
+    deployment.backend.run.assert_not_called()
+
+@pytest.mark.parametrize("missing_tool", ["git", "java", "ssh"])
+def test_check_prerequisites_missing_tool(deployment, missing_tool):
+    """Test prerequisites check when a tool is not on PATH"""
+    with patch('shutil.which', side_effect=lambda tool: None if tool == missing_tool else f"/usr/bin/{tool}"):
+        result = deployment.check_prerequisites()
     
-    @patch('subprocess.run')
-    @patch('pathlib.Path.exists')
-    def test_setup_ssh_config_no_key(self, mock_exists, mock_run):
-        """Test SSH configuration with no key"""
-        mock_exists.return_value = False
-        
-        result = self.deployment.setup_ssh_config()
-        
-        self.assertFalse(result)
+    assert not result
+
+@patch('pathlib.Path.exists')
+def test_setup_ssh_config_success(mock_exists, deployment):
+    """Test successful SSH configuration"""
+    mock_exists.return_value = True
+    deployment.backend.run.return_value = MOCK_SSH_AUTH
     
-    @patch('subprocess.run')
-    def test_clone_repository_success(self, mock_run):
-        """Test successful repository cloning"""
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        with tempfile.TemporaryDirectory() as temp_dir:
-            self.deployment.repo_path = Path(temp_dir) / "test-repo"
-            result = self.deployment.clone_repository()
-        
-        self.assertTrue(result)
+    result = deployment.setup_ssh_config()
     
-    @patch('subprocess.run')
-    def test_clone_repository_failure(self, mock_run):
-        """Test failed repository cloning"""
-        mock_run.return_value = MagicMock(returncode=1, stderr="Permission denied")
-        
-        result = self.deployment.clone_repository()
-        
-        self.assertFalse(result)
+    assert result
+
+@patch('pathlib.Path.exists')
+def test_setup_ssh_config_auth_failure(mock_exists, deployment):
+    """Test SSH configuration when GitHub rejects the key"""
+    mock_exists.return_value = True
+    deployment.backend.run.return_value = MOCK_SSH_DENIED
     
-    @patch('pathlib.Path.exists')
-    def test_verify_jar_file_exists(self, mock_exists):
-        """Test JAR file verification when file exists"""
-        mock_exists.return_value = True
-        
-        with patch('subprocess.run') as mock_run:
-            mock_run.return_value = MagicMock(returncode=0)
-            result = self.deployment.verify_jar_file()
-        
-        self.assertTrue(result)
-    
-    @patch('pathlib.Path.exists')
-    @patch('pathlib.Path.rglob')
-    def test_verify_jar_file_search_alternative(self, mock_rglob, mock_exists):
-        """Test JAR file verification with alternative search"""
-        mock_exists.return_value = False
-        mock_rglob.return_value = [Path("alternative/path/app.jar")]
-        
-        result = self.deployment.verify_jar_file()
-        
-        self.assertTrue(result)
-        self.assertEqual(self.deployment.jar_path, Path("alternative/path/app.jar"))
+    result = deployment.setup_ssh_config()
     
-    @patch('psutil.net_connections')
-    def test_check_port_availability_free(self, mock_connections):
-        """Test port availability check when port is free"""
-        mock_connections.return_value = []
-        
-        result = self.deployment.check_port_availability()
-        
-        self.assertTrue(result)
-    
-    @patch('psutil.net_connections')
-    @patch('psutil.Process')
-    def test_check_port_availability_in_use(self, mock_process_class, mock_connections):
-        """Test port availability check when port is in use"""
-        mock_conn = MagicMock()
-        mock_conn.laddr.port = 9000
-        mock_conn.pid = 1234
-        mock_connections.return_value = [mock_conn]
-        
-        mock_process = MagicMock()
-        mock_process_class.return_value = mock_process
-        
-        result = self.deployment.check_port_availability()
-        
-        self.assertTrue(result)  # Should be True after killing the process
-        mock_process.terminate.assert_called_once()
-    
-    @patch('subprocess.Popen')
-    @patch('os.chdir')
-    def test_start_java_application_success(self, mock_chdir, mock_popen):
-        """Test successful Java application startup"""
-        mock_process = MagicMock()
-        mock_process.pid = 1234
-        mock_process.poll.return_value = None  # Process is running
-        mock_popen.return_value = mock_process
-        
-        with patch('time.sleep'):
-            result = self.deployment.start_java_application()
-        
-        self.assertTrue(result)
-        self.assertEqual(self.deployment.java_process, mock_process)
-    
-    @patch('subprocess.Popen')
-    @patch('os.chdir')
-    def test_start_java_application_failure(self, mock_chdir, mock_popen):
-        """Test failed Java application startup"""
-        mock_process = MagicMock()
-        mock_process.pid = 1234
-        mock_process.poll.return_value = 1  # Process exited with error
-        mock_process.communicate.return_value = ("stdout", "stderr")
-        mock_popen.return_value = mock_process
-        
-        with patch('time.sleep'):
-            result = self.deployment.start_java_application()
-        
-        self.assertFalse(result)
-    
-    @patch('socket.socket')
-    def test_health_check_socket_success(self, mock_socket_class):
-        """Test successful health check using socket"""
-        mock_socket = MagicMock()
-        mock_socket.connect_ex.return_value = 0  # Success
-        mock_socket_class.return_value = mock_socket
-        
-        result = self.deployment.health_check()
-        
-        self.assertTrue(result)
-    
-    @patch('socket.socket')
-    def test_health_check_socket_failure(self, mock_socket_class):
-        """Test failed health check using socket"""
-        mock_socket = MagicMock()
-        mock_socket.connect_ex.return_value = 1  # Failure
-        mock_socket_class.return_value = mock_socket
-        
-        result = self.deployment.health_check()
-        
-        self.assertFalse(result)
+    assert not result
+
+@patch('pathlib.Path.exists')
+def test_setup_ssh_config_no_key(mock_exists, deployment):
+    """Test SSH configuration with no key"""
+    mock_exists.return_value = False
     
-    def test_cleanup_no_process(self):
-        """Test cleanup when no process is running"""
-        self.deployment.java_process = None
-        
-        # Should not raise any exception
-        self.deployment.cleanup()
-    
-    @patch('subprocess.Popen.terminate')
-    @patch('subprocess.Popen.wait')
-    def test_cleanup_with_process(self, mock_wait, mock_terminate):
-        """Test cleanup with running process"""
-        mock_process = MagicMock()
-        self.deployment.java_process = mock_process
+    result = deployment.setup_ssh_config()
+    
+    assert not result
+
+@pytest.mark.parametrize("returncode, expected", [(0, True), (1, False)])
+def test_clone_repository(deployment, returncode, expected):
+    """Test repository cloning succeeds only when git exits cleanly"""
+    deployment.backend.popen.return_value.wait.return_value = returncode
+    deployment.backend.popen.return_value.stderr = io.StringIO("Permission denied\n")
+    # git is mocked, so the checkout directory is never created
+    deployment.repo_path = Path("/nonexistent/fake-test-repo")
+    
+    result = deployment.clone_repository()
+    
+    assert result is expected
+
+def test_clone_repository_uses_shallow(deployment):
+    """Test only the tip of the requested branch is cloned"""
+    deployment.repo_path = Path("/nonexistent/fake-test-repo")
+    
+    deployment.clone_repository()
+    
+    clone_cmd = deployment.backend.popen.call_args.args[0]
+    assert "--depth=1" in clone_cmd
+    assert "--single-branch" in clone_cmd
+    assert clone_cmd[clone_cmd.index("--branch") + 1] == "main"
+
+def test_discard_tree_frees_path(tmp_path):
+    """Test existing checkout is moved aside and removed"""
+    repo_path = tmp_path / "test-repo"
+    (repo_path / "src").mkdir(parents=True)
+    (repo_path / "src" / "App.java").write_text("class App {}")
+    
+    remover = _discard_tree(repo_path)
+    
+    assert not repo_path.exists()
+    remover.join()
+    assert os.listdir(tmp_path) == []
+
+def test_discard_tree_sweeps_interrupted_runs(tmp_path):
+    """Test copies left by an interrupted earlier deploy are removed too"""
+    stale = tmp_path / ".test-repo.old-4242-1"
+    (stale / "src").mkdir(parents=True)
+    (tmp_path / "other-repo").mkdir()
+    
+    remover = _discard_tree(tmp_path / "test-repo")
+    remover.join()
+    
+    assert os.listdir(tmp_path) == ["other-repo"]
+
+def test_clone_repository_cleanup_waits_for_old_checkout(deployment, tmp_path):
+    """Test cleanup joins the thread deleting the previous checkout"""
+    deployment.repo_path = tmp_path / "test-repo"
+    (deployment.repo_path / "src").mkdir(parents=True)
+    
+    deployment.clone_repository()
+    deployment.cleanup()
+    
+    assert deployment._remover is None
+    assert os.listdir(tmp_path) == []
+
+@patch('pathlib.Path.exists')
+def test_verify_jar_file_exists(mock_exists, deployment):
+    """Test JAR file verification when file exists"""
+    mock_exists.return_value = True
+    
+    result = deployment.verify_jar_file()
+    
+    assert result
+
+@patch('pathlib.Path.exists')
+@patch('deploy._find_first_jar')
+def test_verify_jar_file_search_alternative(mock_find_jar, mock_exists, deployment):
+    """Test JAR file verification with alternative search"""
+    mock_exists.return_value = False
+    mock_find_jar.return_value = Path("alternative/path/app.jar")
+    
+    result = deployment.verify_jar_file()
+    
+    assert result
+    assert deployment.jar_path == Path("alternative/path/app.jar")
+    assert mock_find_jar.call_count == 1
+
+@patch('deploy._find_first_jar')
+def test_verify_jar_file_prefers_build_dirs(mock_find_jar, deployment, tmp_path):
+    """Test build output dirs are searched first, skipping non-executable JARs"""
+    (tmp_path / "build" / "libs").mkdir(parents=True)
+    for name in ("app-1.0-plain.jar", "app-1.0-javadoc.jar", "app-1.0.jar"):
+        (tmp_path / "build" / "libs" / name).touch()
+    (tmp_path / "target").mkdir()
+    (tmp_path / "target" / "other.jar").touch()
+    deployment.repo_path = tmp_path
+    deployment.jar_path = tmp_path / "build" / "libs" / "project.jar"
+    
+    assert deployment.verify_jar_file()
+    
+    assert deployment.jar_path == tmp_path / "build" / "libs" / "app-1.0.jar"
+    mock_find_jar.assert_not_called()
+
+def test_find_first_jar_skips_noise_dirs(tmp_path):
+    """Test JAR search prunes noise dirs and by-product JARs and prefers shallow matches"""
+    (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+    (tmp_path / "node_modules" / "pkg" / "dep.jar").touch()
+    (tmp_path / "target" / "nested").mkdir(parents=True)
+    (tmp_path / "target" / "nested" / "deep.jar").touch()
+    (tmp_path / "target" / "app.jar").touch()
+    (tmp_path / "app-sources.jar").touch()
+    
+    assert _find_first_jar(tmp_path) == tmp_path / "target" / "app.jar"
+    assert _find_first_jar(tmp_path / "node_modules" / "missing") is None
+
+def test_find_first_jar_prefers_shallow_sibling(tmp_path):
+    """Test a shallow JAR in a later sibling wins over a deep one in an earlier sibling"""
+    (tmp_path / "a" / "b" / "c").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "c" / "deep.jar").touch()
+    (tmp_path / "z").mkdir()
+    (tmp_path / "z" / "shallow.jar").touch()
+    
+    assert _find_first_jar(tmp_path) == tmp_path / "z" / "shallow.jar"
+
+def test_check_port_availability_free(deployment):
+    """Test port availability check when port is free"""
+    result = deployment.check_port_availability()
+    
+    assert result
+    deployment.backend.port_in_use.assert_called_once_with(9000)
+    deployment.backend.list_connections.assert_not_called()
+
+def test_check_port_availability_in_use(deployment):
+    """Test port availability check when port is in use"""
+    deployment.backend.port_in_use.return_value = True
+    
+    deployment.backend.list_connections.return_value = [
+        Conn(laddr=Addr("127.0.0.1", 5432), pid=999, status="LISTEN", family=socket.AF_INET),
+        Conn(laddr=Addr("0.0.0.0", 9000), pid=1234, status="LISTEN", family=socket.AF_INET),
+    ]
+    
+    result = deployment.check_port_availability()
+    
+    assert result  # Should be True after killing the process
+    deployment.backend.process.assert_called_once_with(1234)
+    deployment.backend.process.return_value.terminate.assert_called_once()
+    deployment.backend.list_connections.assert_called_once_with(kind='tcp')
+
+def test_check_port_availability_terminates_listener_once(deployment):
+    """Test accepted connections on the port do not trigger extra terminations"""
+    deployment.backend.port_in_use.return_value = True
+    deployment.backend.list_connections.return_value = [
+        Conn(laddr=Addr("0.0.0.0", 9000), pid=42, status="LISTEN", family=socket.AF_INET),
+        Conn(laddr=Addr("127.0.0.1", 9000), pid=42, status="ESTABLISHED", family=socket.AF_INET),
+        Conn(laddr=Addr("127.0.0.1", 9000), pid=77, status="TIME_WAIT", family=socket.AF_INET),
+    ]
+    deployment.backend.process.return_value.wait.side_effect = [None, psutil.NoSuchProcess(42)]
+    
+    result = deployment.check_port_availability()
+    
+    assert result
+    deployment.backend.process.assert_called_once_with(42)
+
+def test_check_port_availability_unknown_owner(deployment):
+    """Test port check fails when the process holding the port cannot be found"""
+    deployment.backend.port_in_use.return_value = True
+    
+    result = deployment.check_port_availability()
+    
+    assert not result
+    deployment.backend.process.assert_not_called()
+
+def test_check_port_availability_bind_error(deployment):
+    """Test port check fails on bind errors other than the port being taken"""
+    deployment.backend.port_in_use.side_effect = OSError(errno.EACCES, "Permission denied")
+    
+    result = deployment.check_port_availability()
+    
+    assert not result
+    deployment.backend.list_connections.assert_not_called()
+
+def test_subprocess_backend_port_in_use():
+    """Test the bind probe reports a listening port as taken"""
+    backend = SubprocessBackend()
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+        listener.bind(('0.0.0.0', 0))
+        listener.listen()
+        port = listener.getsockname()[1]
+        
+        assert backend.port_in_use(port)
+    
+    assert not backend.port_in_use(port)
+
+@pytest.mark.parametrize("poll_result, expected", [(None, True), (1, False)])
+def test_start_java_application(deployment, tmp_path, poll_result, expected):
+    """Test Java application startup succeeds only if the process stays up"""
+    deployment.backend.popen.return_value.poll.return_value = poll_result
+    deployment.java_log_path = tmp_path / "java-app.log"
+    
+    result = deployment.start_java_application()
+    
+    assert result is expected
+    assert deployment.java_process == deployment.backend.popen.return_value
+    assert deployment.backend.popen.call_args.kwargs['cwd'] == str(deployment.repo_path)
+    assert 'close_fds' not in deployment.backend.popen.call_args.kwargs
+
+def test_start_java_application_waits_for_port(deployment, tmp_path):
+    """Test startup returns once the app starts accepting connections"""
+    deployment.backend.tcp_connect.side_effect = [ConnectionRefusedError(), ConnectionRefusedError(), None]
+    deployment.java_log_path = tmp_path / "java-app.log"
+    
+    result = deployment.start_java_application()
+    
+    assert result
+    assert deployment.backend.tcp_connect.call_count == 3
+    deployment.backend.tcp_connect.assert_called_with('127.0.0.1', 9000, timeout=1)
+
+def test_start_java_application_exits_while_waiting(deployment, tmp_path):
+    """Test startup fails as soon as the app exits before it listens"""
+    deployment.backend.tcp_connect.side_effect = ConnectionRefusedError()
+    deployment.backend.popen.return_value.poll.side_effect = [None, 1]
+    deployment.java_log_path = tmp_path / "java-app.log"
+    
+    with patch.object(deployment, '_log_java_output') as mock_log_output:
+        result = deployment.start_java_application()
+    
+    assert not result
+    assert deployment.backend.tcp_connect.call_count == 1
+    mock_log_output.assert_called_once()
+
+def test_start_java_application_failure_logs_output(deployment, tmp_path, caplog):
+    """Test a failed startup logs the output written by this launch only"""
+    mock_process = deployment.backend.popen.return_value
+    mock_process.poll.return_value = 1  # Process exited with error
+    deployment.java_log_path = tmp_path / "java-app.log"
+    deployment.java_log_path.write_text("output from a previous run\n")
+    
+    def write_output(*args, **kwargs):
+        kwargs['stdout'].write(b"Error: Unable to access jarfile\n")
+        kwargs['stdout'].flush()
+        return mock_process
+    deployment.backend.popen.side_effect = write_output
+    
+    with caplog.at_level(logging.ERROR, logger='deploy'):
+        result = deployment.start_java_application()
+    
+    assert not result
+    output_lines = [message for message in caplog.messages if "OUTPUT:" in message]
+    assert "Unable to access jarfile" in output_lines[0]
+    assert "previous run" not in output_lines[0]
+
+def test_health_check_http_reuses_session(deployment):
+    """Test repeated health checks go through the same pooled HTTP session"""
+    deployment._session = MagicMock()
+    deployment._session.get.return_value.ok = True
+    
+    assert deployment.health_check()
+    assert deployment.health_check()
+    
+    assert deployment._session.get.call_count == 2
+    deployment._session.get.assert_called_with("http://localhost:9000/health", timeout=10)
+    deployment.backend.tcp_connect.assert_not_called()
+
+def test_health_check_http_failure_falls_back_to_socket(deployment):
+    """Test an HTTP error still lets the port probe decide the result"""
+    deployment._session = MagicMock()
+    deployment._session.get.side_effect = ConnectionError("connection refused")
+    
+    result = deployment.health_check()
+    
+    assert result
+    deployment.backend.tcp_connect.assert_called_once_with('127.0.0.1', 9000, timeout=5)
+
+@pytest.mark.parametrize("connect_error, expected", [(None, True), (ConnectionRefusedError(), False)])
+def test_health_check_socket(deployment, connect_error, expected):
+    """Test health check falls back to probing the port with a socket"""
+    deployment._session = None
+    deployment.backend.tcp_connect.side_effect = connect_error
+    
+    result = deployment.health_check()
+    
+    assert result is expected
+    deployment.backend.tcp_connect.assert_called_once_with('127.0.0.1', 9000, timeout=5)
+
+def test_monitor_application_running(deployment):
+    """Test monitoring returns after the duration while the app runs"""
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(5)"])
+    deployment.java_process = process
+    
+    try:
+        with patch.object(deployment, '_log_java_output') as mock_log_output:
+            deployment.monitor_application(duration=0.2)
+        
+        assert process.poll() is None
+        mock_log_output.assert_not_called()
+    finally:
+        process.kill()
+        process.wait()
+
+def test_monitor_application_heartbeat_at_debug(deployment, caplog):
+    """Test heartbeats are only logged when DEBUG is enabled"""
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(5)"])
+    deployment.java_process = process
+    
+    try:
+        with patch('deploy.HEARTBEAT_INTERVAL', 0.05), \
+             caplog.at_level(logging.DEBUG, logger='deploy'):
+            deployment.monitor_application(duration=0.2)
+        
+        heartbeats = [message for message in caplog.messages if "still running" in message]
+        assert len(heartbeats) >= 2
+    finally:
+        process.kill()
+        process.wait()
+
+def test_monitor_application_exited(deployment):
+    """Test monitoring stops early when the app exits"""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    deployment.java_process = process
+    
+    with patch.object(deployment, '_log_java_output') as mock_log_output:
+        deployment.monitor_application(duration=30)
+    
+    assert process.poll() is not None
+    mock_log_output.assert_called_once()
+
+def test_monitor_application_bounds_each_wait(deployment):
+    """Test a very long monitor duration is waited out in bounded slices"""
+    deployment.java_process = MagicMock(spec=subprocess.Popen)
+    
+    with patch('deploy._wait_for_exit', side_effect=[False, True]) as mock_wait, \
+         patch.object(deployment, '_log_java_output'):
+        deployment.monitor_application(duration=10 ** 9)
+    
+    assert mock_wait.call_count == 2
+    for call in mock_wait.call_args_list:
+        assert call.args[1] <= HEARTBEAT_INTERVAL
+
+def test_cleanup_no_process(deployment):
+    """Test cleanup when no process is running"""
+    deployment.java_process = None
+    
+    # Should not raise any exception
+    deployment.cleanup()
+
+def test_cleanup_with_process(deployment):
+    """Test cleanup with running process"""
+    mock_process = MagicMock(spec=subprocess.Popen)
+    deployment.java_process = mock_process
+    
+    deployment.cleanup()
+    
+    mock_process.terminate.assert_called_once()
+    mock_process.wait.assert_called_once()
+
+def test_deploy_integration(deployment):
+    """Test full deployment integration"""
+    steps = (
+        'check_prerequisites', 'setup_ssh_config', 'clone_repository', 'verify_jar_file',
+        'check_port_availability', 'start_java_application', 'health_check'
+    )
+    with patch.multiple(deployment, **{step: MagicMock(return_value=True) for step in steps}):
+        result = deployment.deploy()
+    
+    assert result
+
+def test_deploy_failure(deployment):
+    """Test deployment failure handling"""
+    with patch.object(deployment, 'check_prerequisites', return_value=False):
+        result = deployment.deploy()
         
-        self.deployment.cleanup()
+        assert not result
+
+def test_deployment_error_is_exception():
+    """Test DeploymentError is caught by generic exception handlers"""
+    assert issubclass(DeploymentError, Exception)
+
+def test_cached_time_formatter_matches_standard_formatter():
+    """Test cached timestamps match logging.Formatter output"""
+    fmt = '%(asctime)s - %(levelname)s - %(message)s'
+    cached = CachedTimeFormatter(fmt)
+    standard = logging.Formatter(fmt)
+    
+    for created in (1700000000.001, 1700000000.999, 1700000001.5, 1700000000.25):
+        record = logging.makeLogRecord({'msg': 'hello', 'levelname': 'INFO', 'levelno': logging.INFO})
+        record.created = created
+        record.msecs = int((created - int(created)) * 1000)
         
-        mock_process.terminate.assert_called_once()
-        mock_process.wait.assert_called_once()
-    
-    def test_deploy_integration(self):
-        """Test full deployment integration"""
-        with patch.object(self.deployment, 'check_prerequisites', return_value=True), \
-             patch.object(self.deployment, 'setup_ssh_config', return_value=True), \
-             patch.object(self.deployment, 'clone_repository', return_value=True), \
-             patch.object(self.deployment, 'verify_jar_file', return_value=True), \
-             patch.object(self.deployment, 'check_port_availability', return_value=True), \
-             patch.object(self.deployment, 'start_java_application', return_value=True), \
-             patch.object(self.deployment, 'health_check', return_value=True):
-            
-            result = self.deployment.deploy()
-            
-            self.assertTrue(result)
-    
-    def test_deploy_failure(self):
-        """Test deployment failure handling"""
-        with patch.object(self.deployment, 'check_prerequisites', return_value=False):
-            result = self.deployment.deploy()
-            
-            self.assertFalse(result)
-
-class TestDeploymentScript(unittest.TestCase):
-    """Test cases for the deployment script functionality"""
-    
-    def test_deployment_error_exception(self):
-        """Test DeploymentError exception"""
-        with self.assertRaises(DeploymentError):
-            raise DeploymentError("Test error")
-
-if __name__ == '__main__':
-    # Configure test logging
-    import logging
-    logging.basicConfig(level=logging.CRITICAL)  # Suppress logs during testing
-    
-    # Run tests
-    unittest.main(verbosity=2)
\ No newline at end of file
+        assert cached.format(record) == standard.format(record)
+
+def test_log_file_records_have_timestamp_and_level():
+    """Test records buffered for deployment.log keep the full log format"""
+    record = logging.makeLogRecord({'msg': 'hello', 'levelname': 'INFO', 'levelno': logging.INFO})
+    
+    formatted = log_file_handler.target.format(record)
+    
+    assert re.fullmatch(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} - INFO - hello", formatted)